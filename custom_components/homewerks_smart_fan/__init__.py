@@ -2,14 +2,19 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
+from urllib.parse import urlparse
 
+from homeassistant.components import ssdp
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_HOST, Platform
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
 from .api import HomewerksSmartFanApi
 from .const import CONF_FRIENDLY_NAME, CONF_UDN, CONF_UUID, DOMAIN
+from .coordinator import HomewerksSmartFanCoordinator
 from .discovery import fetch_device_info, find_device_by_udn
 
 _LOGGER = logging.getLogger(__name__)
@@ -19,49 +24,75 @@ PLATFORMS: list[Platform] = [Platform.FAN, Platform.LIGHT, Platform.MEDIA_PLAYER
 
 async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Migrate config entry from older versions."""
-    if entry.version < 2:
-        _LOGGER.info("Migrating config entry %s from version %s", entry.entry_id, entry.version)
-
-        host = entry.data.get(CONF_HOST)
-        new_data = dict(entry.data)
-
-        # Try to fetch UPnP info to get UDN
-        if host and CONF_UDN not in new_data:
-            device = await fetch_device_info(host)
-            if device and device.udn:
-                new_data[CONF_UDN] = device.udn
-                new_data[CONF_UUID] = device.uuid
-                new_data[CONF_FRIENDLY_NAME] = device.friendly_name
-                _LOGGER.info(
-                    "Migration: discovered UDN %s for %s", device.udn, host
-                )
-            else:
-                # Can't reach UPnP — store empty, will be populated later
-                new_data.setdefault(CONF_UDN, "")
-                new_data.setdefault(CONF_UUID, "")
-                new_data.setdefault(CONF_FRIENDLY_NAME, "")
-                _LOGGER.warning(
-                    "Migration: could not fetch UPnP info from %s. "
-                    "UDN will be populated on next successful connection.",
-                    host,
-                )
+    if entry.version >= 2:
+        return True
 
-        hass.config_entries.async_update_entry(
-            entry,
-            data=new_data,
-            version=2,
-        )
-        _LOGGER.info("Migration complete for %s", entry.entry_id)
+    _LOGGER.info("Migrating config entry %s from version %s", entry.entry_id, entry.version)
+
+    host = entry.data.get(CONF_HOST)
+    updates: dict[str, str] = {}
+
+    # Try to fetch UPnP info to get UDN
+    if host and CONF_UDN not in entry.data:
+        device = await fetch_device_info(async_get_clientsession(hass), host)
+        if device and device.udn:
+            updates[CONF_UDN] = device.udn
+            updates[CONF_UUID] = device.uuid
+            updates[CONF_FRIENDLY_NAME] = device.friendly_name
+            _LOGGER.info(
+                "Migration: discovered UDN %s for %s", device.udn, host
+            )
+        else:
+            # Can't reach UPnP — store empty, will be populated later
+            for key in (CONF_UDN, CONF_UUID, CONF_FRIENDLY_NAME):
+                if key not in entry.data:
+                    updates[key] = ""
+            _LOGGER.warning(
+                "Migration: could not fetch UPnP info from %s. "
+                "UDN will be populated on next successful connection.",
+                host,
+            )
+
+    hass.config_entries.async_update_entry(
+        entry,
+        data={**entry.data, **updates},
+        version=2,
+    )
+    _LOGGER.info("Migration complete for %s", entry.entry_id)
 
     return True
 
 
+async def _async_find_host_by_udn(
+    hass: HomeAssistant, udn: str, failed_host: str
+) -> str | None:
+    """Find the current host of the device with the given UDN.
+
+    Home Assistant's SSDP integration already keeps a cache of devices
+    seen on the network, so check that before falling back to a scan.
+    A cached location pointing at failed_host, the address that just
+    couldn't be reached, is stale and ignored.
+    """
+    if "ssdp" in hass.config.components:
+        for discovery_info in await ssdp.async_get_discovery_info_by_udn(hass, udn):
+            if discovery_info.ssdp_location:
+                host = urlparse(discovery_info.ssdp_location).hostname
+                if host and host != failed_host:
+                    return host
+
+    recovered_device = await find_device_by_udn(
+        async_get_clientsession(hass), udn
+    )
+    return recovered_device.host if recovered_device else None
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Homewerks Smart Fan from a config entry."""
     host = entry.data[CONF_HOST]
     udn = entry.data.get(CONF_UDN, "")
 
-    api = HomewerksSmartFanApi(host)
+    session = async_get_clientsession(hass)
+    api = HomewerksSmartFanApi(host, session)
 
     if not await api.connect():
         # Connection failed — try IP recovery if we have a UDN
@@ -70,21 +101,21 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
                 "Cannot reach %s, scanning network for device UDN %s",
                 host, udn,
             )
-            recovered_device = await find_device_by_udn(udn)
-            if recovered_device and recovered_device.host != host:
+            recovered_host = await _async_find_host_by_udn(hass, udn, host)
+            if recovered_host and recovered_host != host:
                 _LOGGER.info(
                     "Device IP changed: %s → %s. Updating config entry.",
-                    host, recovered_device.host,
+                    host, recovered_host,
                 )
                 hass.config_entries.async_update_entry(
                     entry,
-                    data={**entry.data, CONF_HOST: recovered_device.host},
+                    data={**entry.data, CONF_HOST: recovered_host},
                 )
-                api = HomewerksSmartFanApi(recovered_device.host)
+                api = HomewerksSmartFanApi(recovered_host, session)
                 if not await api.connect():
                     _LOGGER.error(
                         "Still cannot connect to %s after IP recovery",
-                        recovered_device.host,
+                        recovered_host,
                     )
                     return False
             else:
@@ -101,7 +132,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     # If we connected but don't have UDN yet, try to fetch it now
     if not udn:
-        device = await fetch_device_info(entry.data[CONF_HOST])
+        device = await fetch_device_info(session, entry.data[CONF_HOST])
         if device and device.udn:
             _LOGGER.info("Populated UDN %s for %s", device.udn, entry.data[CONF_HOST])
             hass.config_entries.async_update_entry(
@@ -114,13 +145,20 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
                 },
             )
 
-    # Request initial state from the device
-    await api.request_state()
+    coordinator = HomewerksSmartFanCoordinator(hass, entry, api)
+    entry.async_on_unload(coordinator.async_start_push_updates())
 
     hass.data.setdefault(DOMAIN, {})
-    hass.data[DOMAIN][entry.entry_id] = api
+    hass.data[DOMAIN][entry.entry_id] = coordinator
 
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    # The device is already known to be reachable, so the first poll runs
+    # while the platforms are set up instead of holding them back for the
+    # UPnP round trip; entities pick the values up when it completes. A
+    # failed poll marks them unavailable until the next one succeeds.
+    await asyncio.gather(
+        coordinator.async_refresh(),
+        hass.config_entries.async_forward_entry_setups(entry, PLATFORMS),
+    )
 
     return True
 
@@ -128,7 +166,10 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        api: HomewerksSmartFanApi = hass.data[DOMAIN].pop(entry.entry_id)
-        await api.disconnect()
+        coordinator: HomewerksSmartFanCoordinator = hass.data[DOMAIN].pop(
+            entry.entry_id
+        )
+        await coordinator.api.disconnect()
+        coordinator.api.clear_state_callbacks()
 
     return unload_ok
@@ -1,13 +1,31 @@
 """API client for Homewerks Smart Fan."""
 
 import asyncio
-import json
+from collections import deque
+from collections.abc import Awaitable, Callable, Iterable, Mapping
 import logging
-import struct
-from typing import Any
+import random
+import re
+import socket
+from types import MappingProxyType
+from typing import Any, TypeVar
 import aiohttp
 
+try:
+    from orjson import dumps as _json_dumps, loads as _json_loads
+except ImportError:
+    import json
+
+    def _json_dumps(obj: Any) -> bytes:
+        """Serialize to compact JSON bytes, matching orjson's output."""
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+    def _json_loads(data: bytes | memoryview) -> Any:
+        """Deserialize JSON from a bytes-like object."""
+        return json.loads(bytes(data))
+
 from .const import (
+    COLOR_TEMP_SUM,
     CONNECTION_TIMEOUT,
     DEFAULT_PORT,
     FRAME_HEADER,
@@ -28,16 +46,308 @@ from .const import (
 
 _LOGGER = logging.getLogger(__name__)
 
+_T = TypeVar("_T")
+
+_PREFIX_LEN = len(PAYLOAD_PREFIX)
+_SUFFIX_LEN = len(PAYLOAD_SUFFIX)
+_AFFIX_LEN = _PREFIX_LEN + _SUFFIX_LEN
+_OPEN_BRACE = ord("{")
+_JSON_WHITESPACE = frozenset(b" \t\r\n")
+
+# Header, little-endian payload length, padding
+_FRAME_HEADER_LEN = len(FRAME_HEADER) + 4 + len(FRAME_PADDING)
+# Payloads are a few dozen bytes; anything above this is a corrupt header
+_MAX_PAYLOAD_LEN = 4096
+# Always large enough for the biggest frame that may be left pending
+_RECV_BUFFER_SIZE = 8192
+
+# UPnP response values, matched directly against the raw response body
+_RE_CURRENT_VOLUME = re.compile(rb"<CurrentVolume>\s*(\d+)\s*</CurrentVolume>")
+_RE_CURRENT_MUTE = re.compile(rb"<CurrentMute>\s*([01])\s*</CurrentMute>")
+# GetStateVariables returns an escaped XML document of stateVariable elements
+_RE_STATE_VOLUME = re.compile(
+    rb'variableName=(?:"|&quot;)Volume(?:"|&quot;)[^<]*?(?:>|&gt;)\s*(\d+)'
+)
+_RE_STATE_MUTE = re.compile(
+    rb'variableName=(?:"|&quot;)Mute(?:"|&quot;)[^<]*?(?:>|&gt;)\s*([01])'
+)
+
+# SOAP request body, filled in with action, service, arguments, action
+_SOAP_TEMPLATE = b"""<?xml version="1.0" encoding="utf-8"?>
+<s:Envelope s:encodingStyle="http://schemas.xmlsoap.org/soap/encoding/" xmlns:s="http://schemas.xmlsoap.org/soap/envelope/">
+  <s:Body>
+    <u:%b xmlns:u="urn:schemas-upnp-org:service:%b:1">
+      <InstanceID>0</InstanceID>
+      %b
+    </u:%b>
+  </s:Body>
+</s:Envelope>"""
+_SOAP_CHANNEL_MASTER = b"<Channel>Master</Channel>"
+_SOAP_VOLUME_AND_MUTE = b"<StateVariableList>Volume,Mute</StateVariableList>"
+
+# Seconds to wait for more commands to merge into the same frame
+_COALESCE_WINDOW = 0.02
+# Light settings the firmware discards when sent along with light_power=ON
+_LIGHT_SETTING_KEYS = frozenset({KEY_PERCENTAGE, KEY_COLOR_TEMPERATURE})
+
+# Seconds without any data from the device before a keepalive is sent
+_KEEPALIVE_IDLE = 180
+
+
+def _parse_power(value: Any) -> bool:
+    """Convert a reported power value to a bool."""
+    return value == VALUE_ON
+
+
+def _parse_percentage(value: Any) -> int | None:
+    """Convert a reported brightness percentage, or None to ignore it."""
+    # Device broadcasts percentage=255 as a sentinel meaning
+    # "I don't track brightness". Ignore it — only accept 0-100.
+    if isinstance(value, (int, float)) and 0 <= value <= 100:
+        return int(value)
+    return None
+
+
+def _parse_color_temp(value: Any) -> int | None:
+    """Convert a reported color temperature to standard Kelvin."""
+    if not isinstance(value, int):
+        return None
+    # Invert from device scale to standard Kelvin
+    return COLOR_TEMP_SUM - value
+
+
+# Device key -> (state field, converter returning None to ignore the value)
+_STATE_PARSERS: dict[str, tuple[str, Callable[[Any], Any]]] = {
+    KEY_FAN_POWER: ("fan_power", _parse_power),
+    KEY_LIGHT_POWER: ("light_power", _parse_power),
+    KEY_PERCENTAGE: ("brightness", _parse_percentage),
+    KEY_COLOR_TEMPERATURE: ("color_temp", _parse_color_temp),
+}
+
+
+def _build_frame_parts(data: dict[str, Any]) -> tuple[bytes, ...]:
+    """Build the pieces of a frame for sending to the device.
+
+    The pieces can be passed to transport.writelines() as they are,
+    saving the concatenation. On Python 3.12+ and uvloop, writelines()
+    hands them to a single sendmsg() call when the socket is writable,
+    so the kernel gathers them straight from these objects.
+    """
+    body = _json_dumps(data)
+    length = (_AFFIX_LEN + len(body)).to_bytes(4, "little")
+    return (FRAME_HEADER, length, FRAME_PADDING, PAYLOAD_PREFIX, body, PAYLOAD_SUFFIX)
+
+
+def _can_merge(data: dict[str, Any], more: dict[str, Any]) -> bool:
+    """Return whether two queued commands may share a frame.
+
+    The device resets the light on light_power=ON and drops brightness
+    or color temperature sent in the same frame, so those are kept apart.
+    """
+    if data.get(KEY_LIGHT_POWER) == VALUE_ON:
+        return _LIGHT_SETTING_KEYS.isdisjoint(more)
+    if more.get(KEY_LIGHT_POWER) == VALUE_ON:
+        return _LIGHT_SETTING_KEYS.isdisjoint(data)
+    return True
+
+
+def _build_frame(data: dict[str, Any]) -> bytes:
+    """Build a frame for sending to the device as a single bytes object."""
+    return b"".join(_build_frame_parts(data))
+
+
+# Every single-key command the setters and the light entity send is one
+# of a small fixed set (power on/off, a 0-100 percentage, a supported
+# device color temp), so all of those frames are built once at import.
+_FRAME_CACHE: dict[tuple[str, Any], bytes] = {}
+for _key, _values in (
+    (KEY_FAN_POWER, (VALUE_ON, VALUE_OFF)),
+    (KEY_LIGHT_POWER, (VALUE_ON, VALUE_OFF)),
+    (KEY_PERCENTAGE, range(101)),
+    (KEY_COLOR_TEMPERATURE, SUPPORTED_DEVICE_COLOR_TEMPS),
+):
+    for _value in _values:
+        _FRAME_CACHE[(_key, _value)] = _build_frame({_key: _value})
+del _key, _values, _value
+
+
+def _nearest_device_temp(kelvin: int) -> int:
+    """Convert Kelvin to the nearest color temp the device supports.
+
+    The device only supports four discrete color temps, 2200, 2700, 5500
+    and 7000, on a scale inverted from Kelvin.
+    """
+    device_temp = COLOR_TEMP_SUM - kelvin
+    return min(SUPPORTED_DEVICE_COLOR_TEMPS, key=lambda t: abs(t - device_temp))
+
+
+# The snap boundaries fall on multiples of 10 Kelvin, so looking up the
+# value rounded down to a multiple of 10 gives the exact result
+_KELVIN_TO_DEVICE_TEMP: dict[int, int] = {
+    kelvin: _nearest_device_temp(kelvin)
+    for kelvin in range(MIN_COLOR_TEMP_KELVIN, MAX_COLOR_TEMP_KELVIN + 1, 10)
+}
+
+
+def kelvin_to_device_temp(kelvin: int) -> int:
+    """Convert Kelvin to the device color temp that will be sent.
+
+    Values outside the supported range are clamped first.
+    """
+    if kelvin < MIN_COLOR_TEMP_KELVIN:
+        kelvin = MIN_COLOR_TEMP_KELVIN
+    elif kelvin > MAX_COLOR_TEMP_KELVIN:
+        kelvin = MAX_COLOR_TEMP_KELVIN
+    return _KELVIN_TO_DEVICE_TEMP[kelvin // 10 * 10]
+
+
+# Limit for a single UPnP control request
+_UPNP_TIMEOUT = aiohttp.ClientTimeout(total=CONNECTION_TIMEOUT)
+
+
+class _BufferPool:
+    """Process-wide pool of receive buffers shared by all connections.
+
+    A connection only holds a buffer while it has unprocessed bytes, so
+    several fans share a couple of buffers instead of one each.
+    """
+
+    _free: deque[bytearray] = deque()
+
+    @classmethod
+    def acquire(cls) -> bytearray:
+        """Take a buffer from the pool, allocating one if none are free."""
+        return cls._free.popleft() if cls._free else bytearray(_RECV_BUFFER_SIZE)
+
+    @classmethod
+    def release(cls, buf: bytearray) -> None:
+        """Return a buffer to the pool."""
+        cls._free.append(buf)
+
+
+class _FanProtocol(asyncio.BufferedProtocol):
+    """Receive device frames into a pooled reusable buffer.
+
+    Complete payloads are passed to on_payload as memoryviews into the
+    buffer, so they must be consumed before the callback returns.
+    """
+
+    def __init__(
+        self,
+        on_payload: Callable[[memoryview], None],
+        on_connection_lost: Callable[["_FanProtocol", Exception | None], None],
+    ) -> None:
+        """Initialize the protocol."""
+        self._on_payload = on_payload
+        self._on_connection_lost = on_connection_lost
+        self._buf: bytearray | None = None
+        self._used = 0
+        self._closed = False
+        self._paused = False
+        self._drain_waiter: asyncio.Future[None] | None = None
+        self.last_received = 0.0
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        """Return the free tail of the receive buffer."""
+        if self._buf is None:
+            self._buf = _BufferPool.acquire()
+        return memoryview(self._buf)[self._used:]
+
+    def buffer_updated(self, nbytes: int) -> None:
+        """Dispatch every complete frame and keep any partial one."""
+        self.last_received = asyncio.get_running_loop().time()
+        self._used += nbytes
+        buf = self._buf
+        pos = 0
+
+        with memoryview(buf) as view:
+            while True:
+                start = buf.find(FRAME_HEADER, pos, self._used)
+                if start == -1:
+                    # Keep bytes that could be the start of a split header
+                    pos = max(pos, self._used - len(FRAME_HEADER) + 1)
+                    break
+                if self._used - start < _FRAME_HEADER_LEN:
+                    pos = start
+                    break
+                length = int.from_bytes(buf[start + 4:start + 8], "little")
+                if length > _MAX_PAYLOAD_LEN:
+                    # Not a real header; resync on the next one
+                    pos = start + 1
+                    continue
+                end = start + _FRAME_HEADER_LEN + length
+                if end > self._used:
+                    pos = start
+                    break
+                self._on_payload(view[start + _FRAME_HEADER_LEN:end])
+                pos = end
+
+        if pos:
+            remaining = self._used - pos
+            buf[:remaining] = buf[pos:self._used]
+            self._used = remaining
+
+        if not self._used:
+            # Nothing pending; let another connection use the buffer
+            _BufferPool.release(buf)
+            self._buf = None
+
+    def eof_received(self) -> None:
+        """Let the transport close when the device closes its side."""
+        return None
+
+    def pause_writing(self) -> None:
+        """Stop drain() from returning until the send buffer empties."""
+        self._paused = True
+
+    def resume_writing(self) -> None:
+        """Wake up any pending drain()."""
+        self._paused = False
+        waiter, self._drain_waiter = self._drain_waiter, None
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        """Fail pending drains and report the lost connection."""
+        self._closed = True
+        if self._buf is not None:
+            _BufferPool.release(self._buf)
+            self._buf = None
+        waiter, self._drain_waiter = self._drain_waiter, None
+        if waiter is not None and not waiter.done():
+            waiter.set_exception(ConnectionResetError("Connection lost"))
+        self._on_connection_lost(self, exc)
+
+    async def drain(self) -> None:
+        """Wait until the transport is ready for more data."""
+        if self._closed:
+            raise ConnectionResetError("Connection lost")
+        if not self._paused:
+            return
+        if self._drain_waiter is None:
+            self._drain_waiter = asyncio.get_running_loop().create_future()
+        await self._drain_waiter
+
 
 class HomewerksSmartFanApi:
     """API client for communicating with Homewerks Smart Fan."""
 
-    def __init__(self, host: str, port: int = DEFAULT_PORT) -> None:
-        """Initialize the API client."""
+    def __init__(
+        self,
+        host: str,
+        session: aiohttp.ClientSession,
+        port: int = DEFAULT_PORT,
+    ) -> None:
+        """Initialize the API client.
+
+        session is used for the UPnP speaker controls; pass Home
+        Assistant's shared one so connections are kept alive between polls.
+        """
         self._host = host
+        self._session = session
         self._port = port
-        self._reader: asyncio.StreamReader | None = None
-        self._writer: asyncio.StreamWriter | None = None
+        self._transport: asyncio.Transport | None = None
+        self._protocol: _FanProtocol | None = None
         self._lock = asyncio.Lock()
         self._state: dict[str, Any] = {
             "fan_power": False,
@@ -45,33 +355,76 @@ class HomewerksSmartFanApi:
             "brightness": 100,
             "color_temp": 4000,
             "volume": 50,
+            # Unknown until the speaker has been polled
+            "muted": None,
         }
-        self._listener_task: asyncio.Task | None = None
+        # Read-only live view handed out by the state property
+        self._state_view = MappingProxyType(self._state)
+        self._watchdog: asyncio.TimerHandle | None = None
+        self._outbox_task: asyncio.Task | None = None
+        # Queued commands: (data, cache_key, future resolved once written with
+        # the event acknowledging the frame, or None if the write failed)
+        self._outbox: asyncio.Queue[
+            tuple[
+                dict[str, Any],
+                tuple[str, Any] | None,
+                asyncio.Future[asyncio.Event | None],
+            ]
+        ] = asyncio.Queue()
         self._reconnect_task: asyncio.Task | None = None
         self._connected = False
         self._upnp_port = UPNP_PORT
+        # Cleared once the device rejects the optional GetStateVariables
+        self._state_variables_supported = True
         self._state_callbacks: list[callable] = []
+        # Immutable copy iterated on every notification
+        self._state_callbacks_tuple: tuple[callable, ...] = ()
         self._reconnect_delay = 1  # Start with 1 second
         self._max_reconnect_delay = 60  # Cap at 60 seconds
+        self._random = random.Random()  # Reconnect jitter source
         self._should_reconnect = True
+        # Per-key events set when the device reports a key we just sent
+        self._ack_events: dict[str, asyncio.Event] = {}
+        # Events set when the device reports a key with a specific value
+        self._report_waiters: dict[tuple[str, Any], asyncio.Event] = {}
+        # Running queries, joined by callers that ask again meanwhile
+        self._inflight: dict[str, asyncio.Task] = {}
 
     def register_state_callback(self, callback: callable) -> None:
-        """Register a callback to be called when state changes."""
+        """Register a callback to be called when state changes.
+
+        The callback receives the set of state fields that changed.
+        """
         if callback not in self._state_callbacks:
             self._state_callbacks.append(callback)
+            self._state_callbacks_tuple = tuple(self._state_callbacks)
 
     def unregister_state_callback(self, callback: callable) -> None:
         """Unregister a state callback."""
         if callback in self._state_callbacks:
             self._state_callbacks.remove(callback)
+            self._state_callbacks_tuple = tuple(self._state_callbacks)
 
-    def _notify_state_change(self) -> None:
-        """Notify all registered callbacks of a state change."""
-        for callback in self._state_callbacks:
-            try:
-                callback()
-            except Exception as err:
-                _LOGGER.debug("Error in state callback: %s", err)
+    def clear_state_callbacks(self) -> None:
+        """Unregister every state callback.
+
+        Called when the config entry is unloaded so nothing left
+        registered keeps its entity alive through this API object.
+        """
+        self._state_callbacks.clear()
+        self._state_callbacks_tuple = ()
+
+    def _notify_state_change(self, changed: Iterable[str]) -> None:
+        """Notify all registered callbacks of the changed state fields.
+
+        Callbacks are scheduled on the event loop rather than called
+        inline, so a failing callback can't break the caller. Filtering
+        by field is left to the entities.
+        """
+        changed = frozenset(changed)
+        call_soon = asyncio.get_running_loop().call_soon
+        for callback in self._state_callbacks_tuple:
+            call_soon(callback, changed)
 
     @property
     def host(self) -> str:
@@ -84,98 +437,72 @@ class HomewerksSmartFanApi:
         return self._connected
 
     @property
-    def state(self) -> dict[str, Any]:
-        """Return the current state."""
-        return self._state.copy()
-
-    def _build_frame(self, data: dict[str, Any]) -> bytes:
-        """Build a frame for sending to the device."""
-        payload = f'{PAYLOAD_PREFIX}{json.dumps(data)}{PAYLOAD_SUFFIX}'
-        payload_bytes = payload.encode('utf-8')
-        length = struct.pack('<I', len(payload_bytes))
-        return FRAME_HEADER + length + FRAME_PADDING + payload_bytes
-
-    def _parse_response(self, data: bytes) -> list[dict[str, Any]]:
-        """Parse one or more responses from the device.
-
-        The device may send multiple frames concatenated in a single read.
-        Returns a list of parsed JSON payloads.
-        """
-        results = []
-        prefix = PAYLOAD_PREFIX.encode()
-        suffix = PAYLOAD_SUFFIX.encode()
-        search_start = 0
-
-        while search_start < len(data):
-            start = data.find(prefix, search_start)
-            if start == -1:
-                break
+    def state(self) -> Mapping[str, Any]:
+        """Return a read-only view of the current state."""
+        return self._state_view
 
-            start += len(prefix)
-            end = data.find(suffix, start)
-            if end == -1:
-                break
+    @staticmethod
+    def _parse_response(payload: memoryview) -> dict[str, Any] | None:
+        """Parse the payload of a single frame from the device.
 
-            try:
-                json_str = data[start:end].decode('utf-8').strip()
-                parsed = json.loads(json_str)
-                results.append(parsed)
-            except (json.JSONDecodeError, UnicodeDecodeError) as err:
-                _LOGGER.debug("Failed to parse response: %s", err)
+        Returns the JSON object, or None if the payload is not a
+        prefixed/suffixed JSON message.
+        """
+        end = len(payload) - _SUFFIX_LEN
+        if (
+            end < _PREFIX_LEN
+            or payload[:_PREFIX_LEN] != PAYLOAD_PREFIX
+            or payload[end:] != PAYLOAD_SUFFIX
+        ):
+            return None
 
-            search_start = end + len(suffix)
+        # Only JSON objects are meaningful; anything else (keepalive
+        # replies, noise) is rejected without raising a decode error
+        start = _PREFIX_LEN
+        while start < end and payload[start] in _JSON_WHITESPACE:
+            start += 1
+        if start == end or payload[start] != _OPEN_BRACE:
+            return None
 
-        return results
+        try:
+            # JSON tolerates trailing whitespace, so the payload is decoded
+            # straight from a zero-copy view of the buffer
+            return _json_loads(payload[start:end])
+        except ValueError as err:
+            _LOGGER.debug("Failed to parse response: %s", err)
+            return None
 
-    def _invert_color_temp(self, temp: int) -> int:
+    @staticmethod
+    def _invert_color_temp(temp: int) -> int:
         """Invert color temperature (device uses opposite scale from standard Kelvin).
 
         Device: 7000=warm, 5500=soft, 2700=cool, 2200=daylight
         Standard Kelvin: 2200=warm, 2700=soft, 5500=cool, 7000=daylight
         """
-        return MIN_COLOR_TEMP_KELVIN + MAX_COLOR_TEMP_KELVIN - temp
-
-    @staticmethod
-    def _snap_color_temp(temp: int) -> int:
-        """Snap a color temperature to the nearest supported value.
+        return COLOR_TEMP_SUM - temp
 
-        The device only supports four discrete color temps:
-        2200, 2700, 5500, 7000 (device scale).
-        """
-        return min(SUPPORTED_DEVICE_COLOR_TEMPS, key=lambda t: abs(t - temp))
+    def _set_state(self, field: str, value: Any) -> None:
+        """Optimistically set a single state field and notify if it changed."""
+        if self._state[field] != value:
+            self._state[field] = value
+            self._notify_state_change((field,))
 
     def _update_state_from_response(self, parsed: dict[str, Any], notify: bool = True) -> None:
         """Update internal state from parsed response."""
-        changed = False
-        if KEY_FAN_POWER in parsed:
-            new_val = parsed[KEY_FAN_POWER] == VALUE_ON
-            if self._state["fan_power"] != new_val:
-                self._state["fan_power"] = new_val
-                changed = True
-        if KEY_LIGHT_POWER in parsed:
-            new_val = parsed[KEY_LIGHT_POWER] == VALUE_ON
-            if self._state["light_power"] != new_val:
-                self._state["light_power"] = new_val
-                changed = True
-        if KEY_PERCENTAGE in parsed:
-            raw_val = parsed[KEY_PERCENTAGE]
-            # Device broadcasts percentage=255 as a sentinel meaning
-            # "I don't track brightness". Ignore it — only accept 0-100.
-            if isinstance(raw_val, (int, float)) and raw_val <= 100:
-                new_val = int(raw_val)
-                if self._state["brightness"] != new_val:
-                    self._state["brightness"] = new_val
-                    changed = True
-        if KEY_COLOR_TEMPERATURE in parsed:
-            # Invert from device scale to standard Kelvin
-            device_temp = parsed[KEY_COLOR_TEMPERATURE]
-            new_val = self._invert_color_temp(device_temp)
-            if self._state["color_temp"] != new_val:
-                self._state["color_temp"] = new_val
-                changed = True
+        changed: list[str] = []
+        state = self._state
+        for key, value in parsed.items():
+            parser = _STATE_PARSERS.get(key)
+            if parser is None:
+                continue
+            field, convert = parser
+            new_val = convert(value)
+            if new_val is not None and state[field] != new_val:
+                state[field] = new_val
+                changed.append(field)
 
         if changed and notify:
-            self._notify_state_change()
+            self._notify_state_change(changed)
 
     async def connect(self) -> bool:
         """Connect to the device."""
@@ -184,16 +511,41 @@ class HomewerksSmartFanApi:
                 return True
 
             try:
-                self._reader, self._writer = await asyncio.wait_for(
-                    asyncio.open_connection(self._host, self._port),
+                loop = asyncio.get_running_loop()
+                self._transport, self._protocol = await asyncio.wait_for(
+                    loop.create_connection(
+                        lambda: _FanProtocol(
+                            self._handle_payload, self._handle_connection_lost
+                        ),
+                        self._host,
+                        self._port,
+                    ),
                     timeout=CONNECTION_TIMEOUT,
                 )
+                self._protocol.last_received = loop.time()
+
+                # Frames are tiny, so don't let Nagle hold them back, and
+                # let the OS probe for a vanished peer. Also make drain()
+                # wait until the kernel has actually taken the data.
+                sock = self._transport.get_extra_info("socket")
+                if sock is not None:
+                    try:
+                        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+                    except OSError as err:
+                        _LOGGER.debug("Could not set socket options: %s", err)
+                # Frames are tiny and the device is on the LAN, so waiting
+                # until the kernel has taken every byte costs next to nothing
+                # and makes drain() report write failures straight away
+                self._transport.set_write_buffer_limits(high=0, low=0)
                 self._connected = True
                 self._reconnect_delay = 1  # Reset backoff on successful connect
                 _LOGGER.debug("Connected to %s:%s", self._host, self._port)
 
-                # Start background listener
-                self._listener_task = asyncio.create_task(self._listen_for_updates())
+                # Incoming data is handled by the protocol; just watch for silence
+                self._arm_watchdog()
+                if self._outbox_task is None or self._outbox_task.done():
+                    self._outbox_task = asyncio.create_task(self._process_outbox())
 
                 return True
             except (OSError, asyncio.TimeoutError) as err:
@@ -202,16 +554,25 @@ class HomewerksSmartFanApi:
                 return False
 
     async def _schedule_reconnect(self) -> None:
-        """Schedule a reconnection attempt with exponential backoff."""
+        """Schedule a reconnection attempt with exponential backoff.
+
+        The wait is drawn uniformly below the current backoff ("full
+        jitter") so fans dropped by the same Wi-Fi blip don't all
+        reconnect in lockstep.
+        """
         if not self._should_reconnect:
             return
 
+        delay = self._random.uniform(0, self._reconnect_delay)
         _LOGGER.info(
-            "Scheduling reconnect to %s in %s seconds",
+            "Scheduling reconnect to %s in %.1f seconds",
             self._host,
-            self._reconnect_delay,
+            delay,
         )
-        await asyncio.sleep(self._reconnect_delay)
+        await asyncio.sleep(delay)
+        # disconnect() may have run while this was sleeping
+        if not self._should_reconnect:
+            return
 
         # Exponential backoff
         self._reconnect_delay = min(
@@ -238,113 +599,238 @@ class HomewerksSmartFanApi:
                 pass
             self._reconnect_task = None
 
+        if self._outbox_task:
+            self._outbox_task.cancel()
+            try:
+                await self._outbox_task
+            except asyncio.CancelledError:
+                pass
+            self._outbox_task = None
+
         async with self._lock:
-            if self._listener_task:
-                self._listener_task.cancel()
-                try:
-                    await self._listener_task
-                except asyncio.CancelledError:
-                    pass
-                self._listener_task = None
+            if self._watchdog:
+                self._watchdog.cancel()
+                self._watchdog = None
 
-            if self._writer:
-                self._writer.close()
-                try:
-                    await self._writer.wait_closed()
-                except Exception:
-                    pass
-                self._writer = None
-                self._reader = None
+            if self._transport:
+                # Clear the protocol first so its connection_lost is ignored
+                transport = self._transport
+                self._transport = None
+                self._protocol = None
+                transport.close()
 
             self._connected = False
             _LOGGER.debug("Disconnected from %s:%s", self._host, self._port)
 
-    async def _listen_for_updates(self) -> None:
-        """Listen for state updates from the device."""
-        consecutive_timeouts = 0
-        max_timeouts_before_healthcheck = 3
-
-        while self._connected and self._reader:
-            try:
-                data = await asyncio.wait_for(
-                    self._reader.read(4096),
-                    timeout=60,
-                )
-                if not data:
-                    _LOGGER.warning("Connection closed by device")
-                    self._connected = False
-                    break
-
-                consecutive_timeouts = 0  # Reset on successful read
-                parsed_list = self._parse_response(data)
-                for parsed in parsed_list:
-                    _LOGGER.debug("Received state update: %s", parsed)
-                    self._update_state_from_response(parsed)
-
-            except asyncio.TimeoutError:
-                consecutive_timeouts += 1
-                if consecutive_timeouts >= max_timeouts_before_healthcheck:
-                    # Connection may be dead, try a health check
-                    _LOGGER.debug(
-                        "No data for %s minutes, sending keepalive",
-                        consecutive_timeouts,
-                    )
-                    try:
-                        query = {KEY_FAN_POWER: ""}
-                        frame = self._build_frame(query)
-                        self._writer.write(frame)
-                        await self._writer.drain()
-                        consecutive_timeouts = 0
-                    except Exception:
-                        _LOGGER.warning("Keepalive failed, connection appears dead")
-                        self._connected = False
-                        break
-                continue
-            except asyncio.CancelledError:
-                return  # Don't reconnect if deliberately cancelled
-            except Exception as err:
-                _LOGGER.debug("Error reading from device: %s", err)
-                self._connected = False
-                break
+    def _handle_payload(self, payload: memoryview) -> None:
+        """Handle a frame payload received from the device."""
+        parsed = self._parse_response(payload)
+        if parsed is None:
+            return
+        _LOGGER.debug("Received state update: %s", parsed)
+        self._update_state_from_response(parsed)
+        if self._ack_events:
+            for key in parsed:
+                if (ack := self._ack_events.pop(key, None)) is not None:
+                    ack.set()
+        if self._report_waiters:
+            for (key, value), reported in self._report_waiters.items():
+                if parsed.get(key) == value:
+                    reported.set()
+
+    def _handle_connection_lost(
+        self, protocol: _FanProtocol, exc: Exception | None
+    ) -> None:
+        """Handle the device connection closing."""
+        if protocol is not self._protocol:
+            return  # Stale connection, or closed deliberately
+
+        if exc is None:
+            _LOGGER.warning("Connection closed by device")
+        else:
+            _LOGGER.debug("Error reading from device: %s", exc)
+        self._connected = False
+        self._transport = None
+        self._protocol = None
+        if self._watchdog:
+            self._watchdog.cancel()
+            self._watchdog = None
 
         # Connection lost — schedule reconnection
-        if self._should_reconnect and not self._connected:
+        if self._should_reconnect:
             _LOGGER.warning("Connection lost to %s, will attempt reconnect", self._host)
+            self._start_reconnect()
+
+    def _start_reconnect(self) -> None:
+        """Start reconnecting unless a reconnect is already under way.
+
+        Only one reconnect task may exist at a time, so that disconnect()
+        can cancel it.
+        """
+        if not self._should_reconnect:
+            return
+        if self._reconnect_task is None or self._reconnect_task.done():
             self._reconnect_task = asyncio.create_task(self._schedule_reconnect())
 
-    async def _send_command(self, data: dict[str, Any]) -> bool:
-        """Send a command to the device."""
+    def _arm_watchdog(self, delay: float = _KEEPALIVE_IDLE) -> None:
+        """Schedule the idle check.
+
+        A single timer is kept per connection; it checks how long the
+        device has been silent rather than being reset on every read.
+        """
+        self._watchdog = asyncio.get_running_loop().call_later(
+            delay, self._on_idle_timeout
+        )
+
+    def _on_idle_timeout(self) -> None:
+        """Send a keepalive if the device has been silent for too long."""
+        self._watchdog = None
+        protocol = self._protocol
+        if not self._connected or protocol is None:
+            return
+
+        idle = asyncio.get_running_loop().time() - protocol.last_received
+        if idle < _KEEPALIVE_IDLE:
+            self._arm_watchdog(_KEEPALIVE_IDLE - idle)
+            return
+
+        # Connection may be dead, try a health check
+        _LOGGER.debug("No data for %s minutes, sending keepalive", int(idle // 60))
+        try:
+            self._transport.writelines(_build_frame_parts({KEY_FAN_POWER: ""}))
+        except Exception:
+            _LOGGER.warning("Keepalive failed, connection appears dead")
+            self._transport.abort()
+            return
+        self._arm_watchdog()
+
+    async def _send_command(
+        self, data: dict[str, Any], cache_key: tuple[str, Any] | None = None
+    ) -> bool:
+        """Send a command to the device.
+
+        If cache_key is given, the prebuilt frame for it is sent instead
+        of encoding data again.
+        """
         if not self._connected:
             if not await self.connect():
                 return False
 
-        async with self._lock:
-            try:
-                frame = self._build_frame(data)
-                self._writer.write(frame)
-                await self._writer.drain()
+        future: asyncio.Future[asyncio.Event | None] = (
+            asyncio.get_running_loop().create_future()
+        )
+        self._outbox.put_nowait((data, cache_key, future))
+        ack = await future
+        if ack is None:
+            return False
 
-                # Wait briefly for response
-                await asyncio.sleep(0.3)
+        # Wait for the device to report the new value, but don't hold the
+        # lock meanwhile and don't wait longer than the old fixed delay
+        try:
+            await asyncio.wait_for(ack.wait(), timeout=0.3)
+        except asyncio.TimeoutError:
+            pass
 
-                # Update state optimistically and notify
-                self._update_state_from_response(data, notify=True)
+        _LOGGER.debug("Sent command: %s", data)
+        return True
 
-                _LOGGER.debug("Sent command: %s", data)
-                return True
+    async def _process_outbox(self) -> None:
+        """Write queued commands to the device.
 
+        After the first command arrives, anything else queued within a
+        short window (e.g. a brightness slider drag, or a scene setting
+        several attributes) is merged into the same frame, with later
+        values for the same key winning. A command that can't share the
+        frame ends the batch and starts the next one.
+        """
+        held = None
+        while True:
+            if held is not None:
+                (data, cache_key, future), held = held, None
+            else:
+                data, cache_key, future = await self._outbox.get()
+            futures = [future]
+            ack: asyncio.Event | None = None
+            try:
+                await asyncio.sleep(_COALESCE_WINDOW)
+                while not self._outbox.empty():
+                    item = self._outbox.get_nowait()
+                    if not _can_merge(data, item[0]):
+                        held = item
+                        break
+                    if len(futures) == 1:
+                        data = dict(data)
+                        cache_key = None
+                    more, _, future = item
+                    data.update(more)
+                    futures.append(future)
+
+                transport = self._transport
+                protocol = self._protocol
+                if transport is None or protocol is None or not self._connected:
+                    # Dropped during the coalescing window; the connection
+                    # lost handler has already started reconnecting
+                    _LOGGER.debug("Connection lost before command could be sent")
+                    continue
+
+                # No lock needed: writes are synchronous and the transport
+                # keeps them in order. The lock only guards connect/disconnect.
+                frame = _FRAME_CACHE.get(cache_key) if cache_key else None
+                # Registered before writing so a fast reply isn't missed
+                sent_ack = asyncio.Event()
+                for key in data:
+                    self._ack_events[key] = sent_ack
+                if frame is not None:
+                    transport.write(frame)
+                else:
+                    transport.writelines(_build_frame_parts(data))
+                # Usually the kernel takes the whole frame at once
+                if transport.get_write_buffer_size():
+                    await protocol.drain()
+                ack = sent_ack
+            except asyncio.CancelledError:
+                # Shutting down — fail everything still waiting
+                if held is not None:
+                    futures.append(held[2])
+                while not self._outbox.empty():
+                    futures.append(self._outbox.get_nowait()[2])
+                raise
             except Exception as err:
                 _LOGGER.error("Failed to send command: %s", err)
                 self._connected = False
-                if self._should_reconnect:
-                    self._reconnect_task = asyncio.create_task(
-                        self._schedule_reconnect()
-                    )
-                return False
+                self._start_reconnect()
+            finally:
+                for future in futures:
+                    if not future.done():
+                        future.set_result(ack)
+
+    async def _run_shared(
+        self, name: str, func: Callable[[], Awaitable[_T]]
+    ) -> _T:
+        """Run a query, or wait for the same query if it is already running."""
+        task = self._inflight.get(name)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(func())
+            self._inflight[name] = task
+
+            def _done(finished: asyncio.Task) -> None:
+                if self._inflight.get(name) is finished:
+                    del self._inflight[name]
+
+            task.add_done_callback(_done)
+        # Shielded so one caller giving up doesn't cancel it for the others
+        return await asyncio.shield(task)
 
     async def request_state(self) -> bool:
         """Request current state from the device.
 
+        Concurrent calls share a single request.
+        """
+        return await self._run_shared("request_state", self._request_state)
+
+    async def _request_state(self) -> bool:
+        """Request current state from the device.
+
         Sending a key with an empty string value causes the device to
         report back the current value for that key.
         """
@@ -352,118 +838,199 @@ class HomewerksSmartFanApi:
             if not await self.connect():
                 return False
 
-        async with self._lock:
-            try:
-                query = {
-                    KEY_FAN_POWER: "",
-                    KEY_LIGHT_POWER: "",
-                }
-                frame = self._build_frame(query)
-                self._writer.write(frame)
-                await self._writer.drain()
-                _LOGGER.debug("Requested state from device")
-                return True
-            except Exception as err:
-                _LOGGER.debug("Failed to request state: %s", err)
-                return False
+        try:
+            query = {
+                KEY_FAN_POWER: "",
+                KEY_LIGHT_POWER: "",
+            }
+            self._transport.writelines(_build_frame_parts(query))
+            if self._transport.get_write_buffer_size():
+                await self._protocol.drain()
+            _LOGGER.debug("Requested state from device")
+            return True
+        except Exception as err:
+            _LOGGER.debug("Failed to request state: %s", err)
+            return False
+
+    async def request_state_and_volume(
+        self,
+    ) -> tuple[bool, int | None, bool | None]:
+        """Request the device state and read the speaker volume and mute.
+
+        The state query and the UPnP call go out concurrently, so a
+        refresh takes one round trip. Returns whether the state request
+        was sent, the volume and the mute state.
+        """
+        sent, (volume, muted) = await asyncio.gather(
+            self.request_state(), self.get_volume_and_mute()
+        )
+        return sent, volume, muted
 
     async def set_fan_power(self, on: bool) -> bool:
         """Turn the fan on or off."""
-        return await self._send_command({KEY_FAN_POWER: VALUE_ON if on else VALUE_OFF})
+        value = VALUE_ON if on else VALUE_OFF
+        if not await self._send_command({KEY_FAN_POWER: value}, (KEY_FAN_POWER, value)):
+            return False
+        self._set_state("fan_power", on)
+        return True
+
+    async def set_light_power(self, on: bool, confirm_timeout: float = 0) -> bool:
+        """Turn the light on or off.
 
-    async def set_light_power(self, on: bool) -> bool:
-        """Turn the light on or off."""
-        return await self._send_command({KEY_LIGHT_POWER: VALUE_ON if on else VALUE_OFF})
+        With a confirm_timeout, also wait up to that many seconds for the
+        device to report the light in the new state. Any report of the
+        key acknowledges the command, but only one with the new value
+        means the device has actually switched.
+        """
+        value = VALUE_ON if on else VALUE_OFF
+        reported = asyncio.Event()
+        if confirm_timeout:
+            # Registered before sending so a fast reply isn't missed
+            self._report_waiters[(KEY_LIGHT_POWER, value)] = reported
+        try:
+            if not await self._send_command(
+                {KEY_LIGHT_POWER: value}, (KEY_LIGHT_POWER, value)
+            ):
+                return False
+            if confirm_timeout:
+                try:
+                    await asyncio.wait_for(reported.wait(), timeout=confirm_timeout)
+                except asyncio.TimeoutError:
+                    _LOGGER.debug("Device did not confirm light_power=%s", value)
+        finally:
+            if self._report_waiters.get((KEY_LIGHT_POWER, value)) is reported:
+                del self._report_waiters[(KEY_LIGHT_POWER, value)]
+        self._set_state("light_power", on)
+        return True
 
     async def set_brightness(self, brightness: int) -> bool:
         """Set the light brightness (0-100)."""
-        brightness = max(0, min(100, brightness))
-        return await self._send_command({KEY_PERCENTAGE: brightness})
+        brightness = 0 if brightness < 0 else 100 if brightness > 100 else brightness
+        if not await self._send_command(
+            {KEY_PERCENTAGE: brightness}, (KEY_PERCENTAGE, brightness)
+        ):
+            return False
+        self._set_state("brightness", brightness)
+        return True
 
     async def set_color_temperature(self, temp_kelvin: int) -> bool:
         """Set the color temperature in Kelvin."""
-        temp_kelvin = max(MIN_COLOR_TEMP_KELVIN, min(MAX_COLOR_TEMP_KELVIN, temp_kelvin))
-        # Invert to device scale, then snap to nearest supported value
-        device_temp = self._invert_color_temp(temp_kelvin)
-        device_temp = self._snap_color_temp(device_temp)
-        return await self._send_command({KEY_COLOR_TEMPERATURE: device_temp})
+        device_temp = kelvin_to_device_temp(temp_kelvin)
+        if not await self._send_command(
+            {KEY_COLOR_TEMPERATURE: device_temp}, (KEY_COLOR_TEMPERATURE, device_temp)
+        ):
+            return False
+        self._set_state("color_temp", self._invert_color_temp(device_temp))
+        return True
 
     async def send_command(self, data: dict[str, Any]) -> bool:
         """Send a combined command to the device (public API)."""
-        return await self._send_command(data)
+        # A lone brightness or color temperature change is a prebuilt frame
+        cache_key: tuple[str, Any] | None = None
+        if len(data) == 1:
+            ((key, value),) = data.items()
+            if type(value) in (int, str):
+                cache_key = (key, value)
+        if not await self._send_command(data, cache_key):
+            return False
+        # Update state optimistically and notify
+        self._update_state_from_response(data, notify=True)
+        return True
 
     async def test_connection(self) -> bool:
         """Test if we can connect to the device."""
         try:
-            reader, writer = await asyncio.wait_for(
-                asyncio.open_connection(self._host, self._port),
+            transport, _ = await asyncio.wait_for(
+                asyncio.get_running_loop().create_connection(
+                    asyncio.Protocol, self._host, self._port
+                ),
                 timeout=CONNECTION_TIMEOUT,
             )
-            writer.close()
-            await writer.wait_closed()
+            # Reset rather than close; there is nothing to flush
+            transport.abort()
             return True
         except (OSError, asyncio.TimeoutError):
             return False
 
-    async def _upnp_action(self, service: str, action: str, args: str = "") -> str | None:
+    async def _upnp_action(
+        self, service: str, action: str, args: bytes = b""
+    ) -> bytes | None:
         """Execute a UPnP SOAP action."""
         url = f"http://{self._host}:{self._upnp_port}/upnp/control/rendercontrol1"
         headers = {
             "Content-Type": 'text/xml; charset="utf-8"',
             "SOAPACTION": f'"urn:schemas-upnp-org:service:{service}:1#{action}"',
         }
-        body = f"""<?xml version="1.0" encoding="utf-8"?>
-<s:Envelope s:encodingStyle="http://schemas.xmlsoap.org/soap/encoding/" xmlns:s="http://schemas.xmlsoap.org/soap/envelope/">
-  <s:Body>
-    <u:{action} xmlns:u="urn:schemas-upnp-org:service:{service}:1">
-      <InstanceID>0</InstanceID>
-      {args}
-    </u:{action}>
-  </s:Body>
-</s:Envelope>"""
+        action_b = action.encode("ascii")
+        body = _SOAP_TEMPLATE % (action_b, service.encode("ascii"), args, action_b)
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    url, headers=headers, data=body, timeout=aiohttp.ClientTimeout(total=5)
-                ) as response:
-                    return await response.text()
+            async with self._session.post(
+                url, headers=headers, data=body, timeout=_UPNP_TIMEOUT
+            ) as response:
+                return await response.read()
         except Exception as err:
             _LOGGER.error("UPnP action failed: %s", err)
             return None
 
     async def get_volume(self) -> int | None:
+        """Get the current volume level (0-100).
+
+        Concurrent calls share a single request.
+        """
+        return await self._run_shared("get_volume", self._get_volume)
+
+    async def _get_volume(self) -> int | None:
         """Get the current volume level (0-100)."""
         response = await self._upnp_action(
             "RenderingControl",
             "GetVolume",
-            "<Channel>Master</Channel>",
+            _SOAP_CHANNEL_MASTER,
         )
-        if response and "<CurrentVolume>" in response:
-            try:
-                start = response.find("<CurrentVolume>") + len("<CurrentVolume>")
-                end = response.find("</CurrentVolume>")
-                volume = int(response[start:end])
-                if self._state["volume"] != volume:
-                    self._state["volume"] = volume
-                    self._notify_state_change()
-                return volume
-            except (ValueError, IndexError):
-                pass
+        if response and (match := _RE_CURRENT_VOLUME.search(response)):
+            volume = int(match.group(1))
+            self._set_state("volume", volume)
+            return volume
         return None
 
+    async def get_volume_and_mute(self) -> tuple[int | None, bool | None]:
+        """Get the volume level and mute state, in one request if possible.
+
+        GetStateVariables is optional in RenderingControl, so once the
+        device fails to answer it the two values are read separately.
+        """
+        if self._state_variables_supported:
+            response = await self._upnp_action(
+                "RenderingControl",
+                "GetStateVariables",
+                _SOAP_VOLUME_AND_MUTE,
+            )
+            if response is None:
+                return None, None
+            volume_match = _RE_STATE_VOLUME.search(response)
+            mute_match = _RE_STATE_MUTE.search(response)
+            if volume_match and mute_match:
+                volume = int(volume_match.group(1))
+                muted = mute_match.group(1) == b"1"
+                self._set_state("volume", volume)
+                self._set_state("muted", muted)
+                return volume, muted
+            _LOGGER.debug("GetStateVariables not supported by %s", self._host)
+            self._state_variables_supported = False
+
+        volume, mute = await asyncio.gather(self.get_volume(), self.get_mute())
+        return volume, mute
+
     async def set_volume(self, volume: int) -> bool:
         """Set the volume level (0-100)."""
-        volume = max(0, min(100, volume))
+        volume = 0 if volume < 0 else 100 if volume > 100 else volume
         response = await self._upnp_action(
             "RenderingControl",
             "SetVolume",
-            f"<Channel>Master</Channel><DesiredVolume>{volume}</DesiredVolume>",
+            b"<Channel>Master</Channel><DesiredVolume>%d</DesiredVolume>" % volume,
         )
         if response:
-            if self._state["volume"] != volume:
-                self._state["volume"] = volume
-                self._notify_state_change()
+            self._set_state("volume", volume)
             return True
         return False
 
@@ -472,15 +1039,12 @@ class HomewerksSmartFanApi:
         response = await self._upnp_action(
             "RenderingControl",
             "GetMute",
-            "<Channel>Master</Channel>",
+            _SOAP_CHANNEL_MASTER,
         )
-        if response and "<CurrentMute>" in response:
-            try:
-                start = response.find("<CurrentMute>") + len("<CurrentMute>")
-                end = response.find("</CurrentMute>")
-                return response[start:end] == "1"
-            except (ValueError, IndexError):
-                pass
+        if response and (match := _RE_CURRENT_MUTE.search(response)):
+            muted = match.group(1) == b"1"
+            self._set_state("muted", muted)
+            return muted
         return None
 
     async def set_mute(self, mute: bool) -> bool:
@@ -488,6 +1052,9 @@ class HomewerksSmartFanApi:
         response = await self._upnp_action(
             "RenderingControl",
             "SetMute",
-            f"<Channel>Master</Channel><DesiredMute>{1 if mute else 0}</DesiredMute>",
+            b"<Channel>Master</Channel><DesiredMute>%d</DesiredMute>" % mute,
         )
-        return response is not None
+        if response is not None:
+            self._set_state("muted", mute)
+            return True
+        return False
@@ -11,9 +11,10 @@ from homeassistant.config_entries import ConfigFlow, ConfigFlowResult
 from homeassistant.const import CONF_HOST, CONF_NAME
 from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
 from .api import HomewerksSmartFanApi
-from .const import CONF_FRIENDLY_NAME, CONF_UDN, CONF_UUID, DOMAIN
+from .const import CONF_FRIENDLY_NAME, CONF_UDN, CONF_UUID, DEFAULT_NAME, DOMAIN
 from .discovery import DiscoveredDevice, discover_devices, fetch_device_info
 
 _LOGGER = logging.getLogger(__name__)
@@ -23,7 +24,7 @@ MANUAL_ENTRY = "manual"
 
 async def validate_connection(hass: HomeAssistant, host: str) -> bool:
     """Validate that we can connect to the device's MCU port."""
-    api = HomewerksSmartFanApi(host)
+    api = HomewerksSmartFanApi(host, async_get_clientsession(hass))
     return await api.test_connection()
 
 
@@ -34,17 +35,18 @@ async def validate_and_fetch_info(
 
     Raises CannotConnect if the device isn't reachable.
     """
-    api = HomewerksSmartFanApi(host)
+    session = async_get_clientsession(hass)
+    api = HomewerksSmartFanApi(host, session)
     if not await api.test_connection():
         raise CannotConnect
 
-    device = await fetch_device_info(host)
+    device = await fetch_device_info(session, host)
     if device is None:
         # Device is reachable on 8899 but no UPnP description.
         # Create a minimal device info with no UDN.
         device = DiscoveredDevice(
             host=host,
-            friendly_name="Homewerks Smart Fan",
+            friendly_name=DEFAULT_NAME,
             udn="",
             uuid="",
             manufacturer="Unknown",
@@ -89,7 +91,9 @@ class HomewerksSmartFanConfigFlow(ConfigFlow, domain=DOMAIN):
                 )
 
         # Scan for devices
-        self._discovered_devices = await discover_devices()
+        self._discovered_devices = await discover_devices(
+            async_get_clientsession(self.hass)
+        )
 
         if not self._discovered_devices:
             # No devices found, go straight to manual entry
@@ -168,7 +172,9 @@ class HomewerksSmartFanConfigFlow(ConfigFlow, domain=DOMAIN):
                 )
 
         # Scan for devices
-        self._discovered_devices = await discover_devices()
+        self._discovered_devices = await discover_devices(
+            async_get_clientsession(self.hass)
+        )
 
         if not self._discovered_devices:
             return await self.async_step_reconfigure_manual()
@@ -242,7 +248,7 @@ class HomewerksSmartFanConfigFlow(ConfigFlow, domain=DOMAIN):
             updates={CONF_HOST: device.host}
         )
 
-        title = device.friendly_name or "Homewerks Smart Fan"
+        title = device.friendly_name or DEFAULT_NAME
 
         return self.async_create_entry(
             title=title,
@@ -1,7 +1,14 @@
 """Constants for the Homewerks Smart Fan integration."""
 
+from datetime import timedelta
+
 DOMAIN = "homewerks_smart_fan"
 
+# Device registry
+MANUFACTURER = "Homewerks"
+MODEL = "7148-01-AX Smart Fan"
+DEFAULT_NAME = "Homewerks Smart Fan"
+
 # Device connection
 DEFAULT_PORT = 8899
 UPNP_PORT = 59152
@@ -15,8 +22,8 @@ CONF_FRIENDLY_NAME = "friendly_name"
 # Frame protocol
 FRAME_HEADER = b'\x18\x96\x18\x20'
 FRAME_PADDING = b'\x00' * 12
-PAYLOAD_PREFIX = "MCU+PAS+"
-PAYLOAD_SUFFIX = "&"
+PAYLOAD_PREFIX = b'MCU+PAS+'
+PAYLOAD_SUFFIX = b'&'
 
 # JSON keys for commands
 KEY_FAN_POWER = "fan_power"
@@ -31,6 +38,8 @@ VALUE_OFF = "OFF"
 # Color temperature range (Kelvin)
 MIN_COLOR_TEMP_KELVIN = 2200
 MAX_COLOR_TEMP_KELVIN = 7000
+# Device scale and Kelvin are mirrored: device = COLOR_TEMP_SUM - kelvin
+COLOR_TEMP_SUM = MIN_COLOR_TEMP_KELVIN + MAX_COLOR_TEMP_KELVIN
 
 # Supported device color temperature values (device scale, inverted from Kelvin)
 # Device: 7000=warm, 5500=soft, 2700=cool, 2200=daylight
@@ -40,13 +49,24 @@ SUPPORTED_DEVICE_COLOR_TEMPS = [2200, 2700, 5500, 7000]
 MIN_BRIGHTNESS = 0
 MAX_BRIGHTNESS = 100
 
-# Polling interval (seconds)
-SCAN_INTERVAL = 30
+# Polling interval
+SCAN_INTERVAL_SECONDS = 30
+SCAN_INTERVAL = timedelta(seconds=SCAN_INTERVAL_SECONDS)
 
 # Connection timeout (seconds)
 CONNECTION_TIMEOUT = 5
 
+# Seconds to wait for further volume steps before sending the final level
+# (0 sends every step straight away)
+VOLUME_DEBOUNCE_DELAY = 0.1
+
 # Discovery
 DISCOVERY_TIMEOUT = 2
 DISCOVERY_CONCURRENCY = 50
+DISCOVERY_CACHE_TTL = 30
+# Seconds a subnet scan keeps going after the first device is found
+DISCOVERY_SETTLE_TIME = 1.5
 LINKPLAY_MANUFACTURER = "Linkplay Technology Inc."
+SSDP_MULTICAST_ADDR = "239.255.255.250"
+SSDP_PORT = 1900
+SSDP_SEARCH_TARGET = "urn:schemas-upnp-org:device:MediaRenderer:1"
@@ -0,0 +1,75 @@
+"""Data update coordinator for Homewerks Smart Fan."""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Mapping
+import logging
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+
+from .api import HomewerksSmartFanApi
+from .const import DOMAIN, SCAN_INTERVAL
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class HomewerksSmartFanCoordinator(DataUpdateCoordinator[Mapping[str, Any]]):
+    """Poll a device once per interval on behalf of all its entities.
+
+    The device also pushes its state when it changes; those updates are
+    passed on to the entities straight away without waiting for a poll.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, entry: ConfigEntry, api: HomewerksSmartFanApi
+    ) -> None:
+        """Initialize the coordinator."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            config_entry=entry,
+            name=f"{DOMAIN} {api.host}",
+            update_interval=SCAN_INTERVAL,
+        )
+        self.api = api
+        # State fields behind the listener update in progress; None for a
+        # poll, which may have changed anything
+        self.changed_fields: frozenset[str] | None = None
+
+    async def _async_update_data(self) -> Mapping[str, Any]:
+        """Ask the device for its state and poll the speaker volume."""
+        # The device answers the state request asynchronously; its reply
+        # comes back through the push path below
+        sent, _, _ = await self.api.request_state_and_volume()
+        if not sent:
+            raise UpdateFailed(f"Cannot reach Homewerks Smart Fan at {self.api.host}")
+
+        return self.api.state
+
+    @callback
+    def async_start_push_updates(self) -> Callable[[], None]:
+        """Forward state pushed by the device to the entities.
+
+        Returns a function that stops forwarding.
+        """
+        self.api.register_state_callback(self._handle_state_update)
+
+        @callback
+        def _stop() -> None:
+            self.api.unregister_state_callback(self._handle_state_update)
+
+        return _stop
+
+    @callback
+    def _handle_state_update(self, changed: frozenset[str]) -> None:
+        """Handle a state change reported by the API."""
+        # Not async_set_updated_data: that would push back the next poll,
+        # which is the only thing that refreshes the speaker volume
+        self.changed_fields = changed
+        try:
+            self.async_update_listeners()
+        finally:
+            self.changed_fields = None
@@ -3,23 +3,65 @@
 from __future__ import annotations
 
 import asyncio
+import html
 import logging
+import re
+import socket
 from dataclasses import dataclass
-from xml.etree import ElementTree
+from urllib.parse import urlparse
 
 import aiohttp
 
 from .const import (
     DEFAULT_PORT,
+    DISCOVERY_CACHE_TTL,
     DISCOVERY_CONCURRENCY,
+    DISCOVERY_SETTLE_TIME,
     DISCOVERY_TIMEOUT,
     LINKPLAY_MANUFACTURER,
+    SSDP_MULTICAST_ADDR,
+    SSDP_PORT,
+    SSDP_SEARCH_TARGET,
     UPNP_DESCRIPTION_PORT,
 )
 
 _LOGGER = logging.getLogger(__name__)
 
-UPNP_NS = "{urn:schemas-upnp-org:device-1-0}"
+# (loop time, devices) of the last automatic discovery that found anything
+_discovery_cache: tuple[float, list[DiscoveredDevice]] | None = None
+# Automatic discovery currently running, shared by concurrent callers
+_discovery_task: asyncio.Task[list[DiscoveredDevice]] | None = None
+
+_LINKPLAY_MANUFACTURER_B = LINKPLAY_MANUFACTURER.encode("utf-8")
+# Bytes of description.xml read before deciding whether to fetch the rest
+_HEAD_SIZE = 1024
+# SSDP runs over UDP, so the search is repeated in case a packet is lost
+_SSDP_SEARCH_COUNT = 3
+_SSDP_SEARCH_INTERVAL = 0.5
+
+
+def _element_re(tag: str) -> re.Pattern[bytes]:
+    """Compile a pattern capturing the text of the first <tag> element."""
+    return re.compile(rb"<%b>\s*([^<]*?)\s*</%b>" % (tag.encode(), tag.encode()))
+
+
+# description.xml is small and fixed in shape, so the few fields needed are
+# matched straight from the response bytes instead of parsing the document
+_RE_MANUFACTURER = _element_re("manufacturer")
+_RE_FRIENDLY_NAME = _element_re("friendlyName")
+_RE_UDN = _element_re("UDN")
+_RE_UUID = _element_re("uuid")
+_RE_MODEL_NAME = _element_re("modelName")
+_RE_MODEL_DESCRIPTION = _element_re("modelDescription")
+
+SSDP_MSEARCH = (
+    "M-SEARCH * HTTP/1.1\r\n"
+    f"HOST: {SSDP_MULTICAST_ADDR}:{SSDP_PORT}\r\n"
+    'MAN: "ssdp:discover"\r\n'
+    f"ST: {SSDP_SEARCH_TARGET}\r\n"
+    f"MX: {DISCOVERY_TIMEOUT}\r\n"
+    "\r\n"
+).encode("ascii")
 
 
 @dataclass
@@ -35,7 +77,9 @@ class DiscoveredDevice:
     model_description: str
 
 
-async def fetch_device_info(host: str) -> DiscoveredDevice | None:
+async def fetch_device_info(
+    session: aiohttp.ClientSession, host: str
+) -> DiscoveredDevice | None:
     """Fetch UPnP device info from a specific host.
 
     Returns a DiscoveredDevice if the host has a Linkplay-based device
@@ -44,56 +88,118 @@ async def fetch_device_info(host: str) -> DiscoveredDevice | None:
     url = f"http://{host}:{UPNP_DESCRIPTION_PORT}/description.xml"
 
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                url, timeout=aiohttp.ClientTimeout(total=DISCOVERY_TIMEOUT)
-            ) as response:
-                if response.status != 200:
-                    return None
-                xml_text = await response.text()
+        async with session.get(
+            url, timeout=aiohttp.ClientTimeout(total=DISCOVERY_TIMEOUT)
+        ) as response:
+            if response.status != 200:
+                return None
+            body = b""
+            async for chunk in response.content.iter_chunked(_HEAD_SIZE):
+                body += chunk
+                if len(body) >= _HEAD_SIZE:
+                    break
+            # The manufacturer comes early in the document; if another
+            # vendor's is already there, skip downloading the rest
+            if (
+                _RE_MANUFACTURER.search(body)
+                and _LINKPLAY_MANUFACTURER_B not in body
+            ):
+                return None
+            body += await response.content.read()
     except (aiohttp.ClientError, asyncio.TimeoutError, OSError):
         return None
 
-    try:
-        root = ElementTree.fromstring(xml_text)
-        device = root.find(f"{UPNP_NS}device")
-        if device is None:
-            return None
-
-        manufacturer = _text(device, f"{UPNP_NS}manufacturer")
-        if LINKPLAY_MANUFACTURER not in (manufacturer or ""):
-            return None
-
-        # Verify MCU control port is reachable
-        if not await _check_port(host, DEFAULT_PORT):
-            return None
-
-        udn = _text(device, f"{UPNP_NS}UDN") or ""
-        uuid_raw = _text(device, f"{UPNP_NS}uuid") or ""
-
-        return DiscoveredDevice(
-            host=host,
-            friendly_name=_text(device, f"{UPNP_NS}friendlyName") or "Unknown",
-            udn=udn,
-            uuid=uuid_raw,
-            manufacturer=manufacturer or "",
-            model_name=_text(device, f"{UPNP_NS}modelName") or "",
-            model_description=_text(device, f"{UPNP_NS}modelDescription") or "",
-        )
-    except ElementTree.ParseError:
-        _LOGGER.debug("Failed to parse UPnP XML from %s", host)
+    # Cheap check before looking at any fields
+    if _LINKPLAY_MANUFACTURER_B not in body:
+        return None
+
+    manufacturer = _text(body, _RE_MANUFACTURER)
+    if manufacturer is None or LINKPLAY_MANUFACTURER not in manufacturer:
+        _LOGGER.debug("Unexpected UPnP description from %s", host)
+        return None
+
+    # Verify MCU control port is reachable
+    if not await _check_port(host, DEFAULT_PORT):
         return None
 
+    return DiscoveredDevice(
+        host=host,
+        friendly_name=_text(body, _RE_FRIENDLY_NAME) or "Unknown",
+        udn=_text(body, _RE_UDN) or "",
+        uuid=_text(body, _RE_UUID) or "",
+        manufacturer=manufacturer,
+        model_name=_text(body, _RE_MODEL_NAME) or "",
+        model_description=_text(body, _RE_MODEL_DESCRIPTION) or "",
+    )
+
 
 async def discover_devices(
+    session: aiohttp.ClientSession,
     network_prefix: str | None = None,
 ) -> list[DiscoveredDevice]:
-    """Scan the local /24 subnet for Homewerks Smart Fan devices.
+    """Find Homewerks Smart Fan devices on the local network.
 
-    If network_prefix is not provided, attempts to detect it automatically.
+    Without a network_prefix, an SSDP search is sent first and only the
+    hosts that answer are queried. If none of them is a fan, the local
+    /24 subnet is scanned instead, detecting the prefix automatically.
     network_prefix should be like "10.0.0" (first three octets).
+
+    Automatic discovery results are reused for DISCOVERY_CACHE_TTL
+    seconds, and callers arriving while one is running share it.
     """
+    if network_prefix is not None:
+        return await _async_discover(session, network_prefix)
+
+    global _discovery_task
+    loop = asyncio.get_running_loop()
+    if (
+        _discovery_cache is not None
+        and loop.time() - _discovery_cache[0] < DISCOVERY_CACHE_TTL
+    ):
+        return list(_discovery_cache[1])
+
+    task = _discovery_task
+    if task is None:
+        task = _discovery_task = loop.create_task(_async_discover(session, None))
+
+        def _done(finished: asyncio.Task[list[DiscoveredDevice]]) -> None:
+            global _discovery_task
+            if _discovery_task is finished:
+                _discovery_task = None
+
+        # Cleared by the task itself, so it is also forgotten when every
+        # caller was cancelled before it finished
+        task.add_done_callback(_done)
+    # Shielded so one caller giving up doesn't cancel it for the others
+    devices = await asyncio.shield(task)
+
+    # An empty result isn't cached, so a retry scans again straight away
+    if devices:
+        _cache_devices(devices)
+    return list(devices)
+
+
+def _cache_devices(devices: list[DiscoveredDevice]) -> None:
+    """Remember the result of a discovery for DISCOVERY_CACHE_TTL seconds."""
+    global _discovery_cache
+    _discovery_cache = (asyncio.get_running_loop().time(), devices)
+
+
+async def _async_discover(
+    session: aiohttp.ClientSession, network_prefix: str | None
+) -> list[DiscoveredDevice]:
+    """Run a discovery without using or updating the cache."""
     if network_prefix is None:
+        hosts = await _ssdp_search()
+        if hosts:
+            _LOGGER.debug("SSDP search found %d UPnP hosts", len(hosts))
+            results = await asyncio.gather(
+                *(fetch_device_info(session, host) for host in hosts)
+            )
+            if found := [device for device in results if device]:
+                return found
+            # Other UPnP devices answered, but the fan's reply may have
+            # been lost; fall back to the scan
         network_prefix = await _detect_network_prefix()
         if network_prefix is None:
             _LOGGER.warning("Could not detect local network prefix for discovery")
@@ -103,45 +209,138 @@ async def discover_devices(
 
     semaphore = asyncio.Semaphore(DISCOVERY_CONCURRENCY)
     devices: list[DiscoveredDevice] = []
+    host_suffixes = range(1, 255)
+    unstarted = len(host_suffixes)
 
     async def _probe(host_suffix: int) -> None:
+        nonlocal unstarted
         host = f"{network_prefix}.{host_suffix}"
         async with semaphore:
+            unstarted -= 1
             # Quick port check first to avoid slow HTTP timeout
             if not await _check_port(host, UPNP_DESCRIPTION_PORT):
                 return
-            device = await fetch_device_info(host)
+            device = await fetch_device_info(session, host)
             if device:
                 _LOGGER.debug("Discovered device: %s at %s", device.friendly_name, host)
                 devices.append(device)
 
-    tasks = [_probe(i) for i in range(1, 255)]
-    await asyncio.gather(*tasks)
+    loop = asyncio.get_running_loop()
+    pending = {loop.create_task(_probe(i)) for i in host_suffixes}
+    try:
+        # Wait for every probe until something is found and every host has
+        # been tried, then only a short while longer rather than for the
+        # slowest timeouts. Probes queue on the semaphore, so settling any
+        # earlier would skip the hosts that haven't had their turn yet.
+        while pending and not (devices and unstarted == 0):
+            _, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+        if pending:
+            await asyncio.wait(pending, timeout=DISCOVERY_SETTLE_TIME)
+    finally:
+        for task in pending:
+            task.cancel()
 
     return devices
 
 
-async def find_device_by_udn(udn: str) -> DiscoveredDevice | None:
+async def find_device_by_udn(
+    session: aiohttp.ClientSession, udn: str
+) -> DiscoveredDevice | None:
     """Scan the network for a device matching the given UDN.
 
-    Used for automatic IP recovery when a device's IP changes.
+    Used for automatic IP recovery when a device's IP changes. If the
+    device isn't among those discovered (or cached), the local /24
+    subnet is swept for it: with several fans, SSDP may have heard from
+    all but this one. The sweep's result then replaces the cached list,
+    so later lookups and the config flow don't get the partial one.
     """
-    devices = await discover_devices()
+    if device := _match_udn(await discover_devices(session), udn):
+        return device
+
+    network_prefix = await _detect_network_prefix()
+    if network_prefix is None:
+        return None
+    devices = await _async_discover(session, network_prefix)
+    if devices:
+        _cache_devices(devices)
+    return _match_udn(devices, udn)
+
+
+def _match_udn(
+    devices: list[DiscoveredDevice], udn: str
+) -> DiscoveredDevice | None:
+    """Return the device with the given UDN, if it is in the list."""
     for device in devices:
         if device.udn == udn:
             return device
     return None
 
 
+class _SsdpSearchProtocol(asyncio.DatagramProtocol):
+    """Collect the hosts answering an SSDP M-SEARCH."""
+
+    def __init__(self) -> None:
+        """Initialize the protocol."""
+        self.hosts: set[str] = set()
+
+    def datagram_received(self, data: bytes, addr: tuple[str, int]) -> None:
+        """Record the host from a response's LOCATION header."""
+        for line in data.split(b"\r\n"):
+            name, sep, value = line.partition(b":")
+            if sep and name.strip().lower() == b"location":
+                try:
+                    host = urlparse(value.strip().decode("ascii")).hostname
+                except (UnicodeDecodeError, ValueError):
+                    return
+                if host:
+                    self.hosts.add(host)
+                return
+
+
+async def _ssdp_search() -> set[str]:
+    """Send an SSDP M-SEARCH and return the hosts that answer."""
+    loop = asyncio.get_running_loop()
+    try:
+        transport, protocol = await loop.create_datagram_endpoint(
+            _SsdpSearchProtocol,
+            local_addr=("0.0.0.0", 0),
+            family=socket.AF_INET,
+        )
+    except OSError as err:
+        _LOGGER.debug("Could not open SSDP socket: %s", err)
+        return set()
+
+    try:
+        sock = transport.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 2)
+        for _ in range(_SSDP_SEARCH_COUNT):
+            transport.sendto(SSDP_MSEARCH, (SSDP_MULTICAST_ADDR, SSDP_PORT))
+            await asyncio.sleep(_SSDP_SEARCH_INTERVAL)
+        # Devices spread their replies over MX seconds after the last search
+        await asyncio.sleep(DISCOVERY_TIMEOUT)
+    except OSError as err:
+        _LOGGER.debug("SSDP search failed: %s", err)
+    finally:
+        transport.close()
+
+    return protocol.hosts
+
+
 async def _check_port(host: str, port: int) -> bool:
     """Check if a TCP port is open on a host."""
     try:
-        _, writer = await asyncio.wait_for(
-            asyncio.open_connection(host, port),
+        transport, _ = await asyncio.wait_for(
+            asyncio.get_running_loop().create_connection(
+                asyncio.Protocol, host, port
+            ),
             timeout=DISCOVERY_TIMEOUT,
         )
-        writer.close()
-        await writer.wait_closed()
+        # Reset instead of a graceful close so the probe doesn't wait on
+        # the FIN exchange or leave a TIME_WAIT socket behind
+        transport.abort()
         return True
     except (OSError, asyncio.TimeoutError):
         return False
@@ -150,29 +349,26 @@ async def _check_port(host: str, port: int) -> bool:
 async def _detect_network_prefix() -> str | None:
     """Try to detect the local network prefix (first 3 octets).
 
-    Uses a non-blocking approach to determine the local IP.
+    Connecting a UDP socket only picks a route and sends nothing, so this
+    runs directly in the event loop without a thread.
     """
-    import socket
-
-    def _get_prefix() -> str | None:
-        try:
-            # Connect to a public DNS to determine local IP (no data sent)
-            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            s.settimeout(1)
+    try:
+        # Route towards a public DNS server to determine the local IP
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+            s.setblocking(False)
             s.connect(("8.8.8.8", 80))
             local_ip = s.getsockname()[0]
-            s.close()
-            parts = local_ip.split(".")
-            if len(parts) == 4:
-                return ".".join(parts[:3])
-        except Exception:
-            pass
+    except OSError:
         return None
-
-    return await asyncio.get_running_loop().run_in_executor(None, _get_prefix)
+    parts = local_ip.split(".")
+    if len(parts) == 4:
+        return ".".join(parts[:3])
+    return None
 
 
-def _text(element: ElementTree.Element, tag: str) -> str | None:
-    """Get text content of a child element."""
-    child = element.find(tag)
-    return child.text.strip() if child is not None and child.text else None
+def _text(body: bytes, pattern: re.Pattern[bytes]) -> str | None:
+    """Get the unescaped text of the first element matching a pattern."""
+    match = pattern.search(body)
+    if match is None or not match.group(1):
+        return None
+    return html.unescape(match.group(1).decode("utf-8", "replace"))
@@ -0,0 +1,56 @@
+"""Base entity for Homewerks Smart Fan."""
+
+from __future__ import annotations
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import callback
+from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN, MANUFACTURER, MODEL
+from .coordinator import HomewerksSmartFanCoordinator
+
+
+def _device_info(entry: ConfigEntry, name: str) -> DeviceInfo:
+    """Return the device info shared by all entities of an entry."""
+    return DeviceInfo(
+        identifiers={(DOMAIN, entry.entry_id)},
+        name=name,
+        manufacturer=MANUFACTURER,
+        model=MODEL,
+    )
+
+
+class HomewerksSmartFanBaseEntity(CoordinatorEntity[HomewerksSmartFanCoordinator]):
+    """Common base for the fan, light and speaker entities."""
+
+    _attr_has_entity_name = True
+
+    # Appended to the entry ID to form the unique ID
+    _unique_id_suffix: str
+    # State fields this entity shows
+    _watched_fields: frozenset[str] = frozenset()
+
+    def __init__(
+        self,
+        coordinator: HomewerksSmartFanCoordinator,
+        entry: ConfigEntry,
+        name: str,
+    ) -> None:
+        """Initialize the entity."""
+        super().__init__(coordinator)
+        self._api = coordinator.api
+        self._attr_unique_id = f"{entry.entry_id}_{self._unique_id_suffix}"
+        self._attr_device_info = _device_info(entry, name)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state unless only fields this entity ignores changed."""
+        changed = self.coordinator.changed_fields
+        if changed is None or changed & self._watched_fields:
+            super()._handle_coordinator_update()
+
+    @property
+    def available(self) -> bool:
+        """Return True if entity is available."""
+        return super().available and self._api.connected
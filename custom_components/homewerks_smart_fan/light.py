@@ -2,8 +2,6 @@
 
 from __future__ import annotations
 
-import asyncio
-from datetime import timedelta
 import logging
 from typing import Any
 
@@ -15,25 +13,31 @@ from homeassistant.components.light import (
 )
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_NAME
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .api import HomewerksSmartFanApi
+from .api import kelvin_to_device_temp
 from .const import (
+    DEFAULT_NAME,
     DOMAIN,
     KEY_COLOR_TEMPERATURE,
     KEY_LIGHT_POWER,
     KEY_PERCENTAGE,
     MAX_COLOR_TEMP_KELVIN,
     MIN_COLOR_TEMP_KELVIN,
-    SCAN_INTERVAL as SCAN_INTERVAL_SECONDS,
-    SUPPORTED_DEVICE_COLOR_TEMPS,
     VALUE_ON,
 )
+from .coordinator import HomewerksSmartFanCoordinator
+from .entity import HomewerksSmartFanBaseEntity
 
 _LOGGER = logging.getLogger(__name__)
 
-SCAN_INTERVAL = timedelta(seconds=SCAN_INTERVAL_SECONDS)
+# Brightness conversions between device percent (0-100) and HA (0-255)
+_PERCENT_TO_BRIGHTNESS = tuple(int(p * 255 / 100) for p in range(101))
+_BRIGHTNESS_TO_PERCENT = tuple(int(b * 100 / 255) for b in range(256))
+
+# Longest wait for the device to report the light on before sending settings
+_POWER_ON_TIMEOUT = 0.5
 
 
 async def async_setup_entry(
@@ -42,51 +46,22 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up Homewerks Smart Fan light from a config entry."""
-    api: HomewerksSmartFanApi = hass.data[DOMAIN][entry.entry_id]
-    name = entry.data.get(CONF_NAME, "Homewerks Smart Fan")
+    coordinator: HomewerksSmartFanCoordinator = hass.data[DOMAIN][entry.entry_id]
+    name = entry.data.get(CONF_NAME) or DEFAULT_NAME
 
-    async_add_entities([HomewerksSmartFanLight(api, entry, name)])
+    async_add_entities([HomewerksSmartFanLight(coordinator, entry, name)])
 
 
-class HomewerksSmartFanLight(LightEntity):
+class HomewerksSmartFanLight(HomewerksSmartFanBaseEntity, LightEntity):
     """Representation of a Homewerks Smart Fan light."""
 
-    _attr_has_entity_name = True
     _attr_color_mode = ColorMode.COLOR_TEMP
     _attr_supported_color_modes = {ColorMode.COLOR_TEMP}
     _attr_min_color_temp_kelvin = MIN_COLOR_TEMP_KELVIN
     _attr_max_color_temp_kelvin = MAX_COLOR_TEMP_KELVIN
-    _attr_should_poll = True
-
-    def __init__(
-        self,
-        api: HomewerksSmartFanApi,
-        entry: ConfigEntry,
-        name: str,
-    ) -> None:
-        """Initialize the light."""
-        self._api = api
-        self._attr_unique_id = f"{entry.entry_id}_light"
-        self._attr_name = "Light"
-        self._attr_device_info = {
-            "identifiers": {(DOMAIN, entry.entry_id)},
-            "name": name,
-            "manufacturer": "Homewerks",
-            "model": "7148-01-AX Smart Fan",
-        }
-
-    async def async_added_to_hass(self) -> None:
-        """Run when entity is added to hass."""
-        self._api.register_state_callback(self._handle_state_update)
-
-    async def async_will_remove_from_hass(self) -> None:
-        """Run when entity is removed from hass."""
-        self._api.unregister_state_callback(self._handle_state_update)
-
-    @callback
-    def _handle_state_update(self) -> None:
-        """Handle state update from the API."""
-        self.async_write_ha_state()
+    _attr_name = "Light"
+    _unique_id_suffix = "light"
+    _watched_fields = frozenset({"light_power", "brightness", "color_temp"})
 
     @property
     def is_on(self) -> bool:
@@ -96,9 +71,7 @@ class HomewerksSmartFanLight(LightEntity):
     @property
     def brightness(self) -> int | None:
         """Return the brightness of this light (0-255)."""
-        # Convert from 0-100 to 0-255
-        percentage = self._api.state.get("brightness", 100)
-        return int(percentage * 255 / 100)
+        return _PERCENT_TO_BRIGHTNESS[self._api.state.get("brightness", 100)]
 
     @property
     def color_temp_kelvin(self) -> int | None:
@@ -118,26 +91,30 @@ class HomewerksSmartFanLight(LightEntity):
 
         # Handle brightness change
         if ATTR_BRIGHTNESS in kwargs:
-            # Convert from HA 0-255 to device 0-100
-            brightness = int(kwargs[ATTR_BRIGHTNESS] * 100 / 255)
-            command[KEY_PERCENTAGE] = brightness
+            brightness = kwargs[ATTR_BRIGHTNESS]
+            brightness = 0 if brightness < 0 else 255 if brightness > 255 else brightness
+            command[KEY_PERCENTAGE] = _BRIGHTNESS_TO_PERCENT[brightness]
 
         # Handle color temperature change
         if ATTR_COLOR_TEMP_KELVIN in kwargs:
-            temp_kelvin = kwargs[ATTR_COLOR_TEMP_KELVIN]
-            temp_kelvin = max(MIN_COLOR_TEMP_KELVIN, min(MAX_COLOR_TEMP_KELVIN, temp_kelvin))
-            # Invert to device scale, then snap to nearest supported value
-            device_temp = MIN_COLOR_TEMP_KELVIN + MAX_COLOR_TEMP_KELVIN - temp_kelvin
-            device_temp = min(SUPPORTED_DEVICE_COLOR_TEMPS, key=lambda t: abs(t - device_temp))
-            command[KEY_COLOR_TEMPERATURE] = device_temp
+            # Clamped, inverted to device scale and snapped to the nearest
+            # supported value by table lookup
+            command[KEY_COLOR_TEMPERATURE] = kelvin_to_device_temp(
+                kwargs[ATTR_COLOR_TEMP_KELVIN]
+            )
 
         if not self.is_on:
             # Light is off — turn it on first, then apply settings
-            await self._api.set_light_power(True)
-            if command:
-                # Brief delay so the device finishes its power-on reset
-                await asyncio.sleep(0.5)
-                await self._api.send_command(command)
+            if not command:
+                await self._api.set_light_power(True)
+                return
+            # Wait for the device to report the light on, so its power-on
+            # reset is over before the settings go out
+            if not await self._api.set_light_power(
+                True, confirm_timeout=_POWER_ON_TIMEOUT
+            ):
+                return
+            await self._api.send_command(command)
         elif command:
             # Light is already on — just send the adjustment, no power command
             await self._api.send_command(command)
@@ -145,12 +122,3 @@ class HomewerksSmartFanLight(LightEntity):
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn off the light."""
         await self._api.set_light_power(False)
-
-    @property
-    def available(self) -> bool:
-        """Return True if entity is available."""
-        return self._api.connected
-
-    async def async_update(self) -> None:
-        """Poll the device for current state as a fallback."""
-        await self._api.request_state()
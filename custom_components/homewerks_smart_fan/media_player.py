@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from datetime import timedelta
+import asyncio
 import logging
 from typing import Any
 
@@ -16,13 +16,12 @@ from homeassistant.const import CONF_NAME
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .api import HomewerksSmartFanApi
-from .const import DOMAIN, SCAN_INTERVAL as SCAN_INTERVAL_SECONDS
+from .const import DEFAULT_NAME, DOMAIN, VOLUME_DEBOUNCE_DELAY
+from .coordinator import HomewerksSmartFanCoordinator
+from .entity import HomewerksSmartFanBaseEntity
 
 _LOGGER = logging.getLogger(__name__)
 
-SCAN_INTERVAL = timedelta(seconds=SCAN_INTERVAL_SECONDS)
-
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -30,56 +29,47 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up Homewerks Smart Fan speaker from a config entry."""
-    api: HomewerksSmartFanApi = hass.data[DOMAIN][entry.entry_id]
-    name = entry.data.get(CONF_NAME, "Homewerks Smart Fan")
+    coordinator: HomewerksSmartFanCoordinator = hass.data[DOMAIN][entry.entry_id]
+    name = entry.data.get(CONF_NAME) or DEFAULT_NAME
 
-    async_add_entities([HomewerksSmartFanSpeaker(api, entry, name)])
+    async_add_entities([HomewerksSmartFanSpeaker(coordinator, entry, name)])
 
 
-class HomewerksSmartFanSpeaker(MediaPlayerEntity):
+class HomewerksSmartFanSpeaker(HomewerksSmartFanBaseEntity, MediaPlayerEntity):
     """Representation of a Homewerks Smart Fan speaker."""
 
-    _attr_has_entity_name = True
     _attr_icon = "mdi:speaker"
     _attr_supported_features = (
         MediaPlayerEntityFeature.VOLUME_SET
         | MediaPlayerEntityFeature.VOLUME_MUTE
         | MediaPlayerEntityFeature.VOLUME_STEP
     )
-    _attr_should_poll = True
+    _attr_name = "Speaker"
+    _unique_id_suffix = "speaker"
+    _watched_fields = frozenset({"volume", "muted"})
 
     def __init__(
         self,
-        api: HomewerksSmartFanApi,
+        coordinator: HomewerksSmartFanCoordinator,
         entry: ConfigEntry,
         name: str,
     ) -> None:
         """Initialize the speaker."""
-        self._api = api
-        self._attr_unique_id = f"{entry.entry_id}_speaker"
-        self._attr_name = "Speaker"
-        self._attr_device_info = {
-            "identifiers": {(DOMAIN, entry.entry_id)},
-            "name": name,
-            "manufacturer": "Homewerks",
-            "model": "7148-01-AX Smart Fan",
-        }
-        self._is_muted = False
-
-    async def async_added_to_hass(self) -> None:
-        """Run when entity is added to hass."""
-        self._api.register_state_callback(self._handle_state_update)
-        # Fetch initial volume
-        await self._api.get_volume()
+        super().__init__(coordinator, entry, name)
+        # Level waiting to be sent (or being sent) after a burst of changes
+        self._pending_volume: int | None = None
+        self._volume_timer: asyncio.TimerHandle | None = None
+        self._volume_send: asyncio.Task | None = None
 
     async def async_will_remove_from_hass(self) -> None:
         """Run when entity is removed from hass."""
-        self._api.unregister_state_callback(self._handle_state_update)
-
-    @callback
-    def _handle_state_update(self) -> None:
-        """Handle state update from the API."""
-        self.async_write_ha_state()
+        if self._volume_timer is not None:
+            self._volume_timer.cancel()
+            self._volume_timer = None
+        if self._volume_send is not None:
+            self._volume_send.cancel()
+            self._volume_send = None
+        await super().async_will_remove_from_hass()
 
     @property
     def state(self) -> MediaPlayerState:
@@ -90,39 +80,80 @@ class HomewerksSmartFanSpeaker(MediaPlayerEntity):
     @property
     def volume_level(self) -> float | None:
         """Return the volume level (0.0 to 1.0)."""
-        volume = self._api.state.get("volume", 50)
-        return volume / 100.0
+        return self._current_volume() / 100.0
 
     @property
     def is_volume_muted(self) -> bool | None:
         """Return if volume is muted."""
-        return self._is_muted
+        return self._api.state.get("muted")
+
+    def _current_volume(self) -> int:
+        """Return the volume level (0-100), including any unsent change."""
+        if self._pending_volume is not None:
+            return self._pending_volume
+        return self._api.state.get("volume", 50)
 
     async def async_set_volume_level(self, volume: float) -> None:
         """Set volume level (0.0 to 1.0)."""
-        await self._api.set_volume(int(volume * 100))
+        await self._async_schedule_volume(int(volume * 100))
 
     async def async_volume_up(self) -> None:
         """Increase volume by 5%."""
-        current = self._api.state.get("volume", 50)
-        await self._api.set_volume(min(100, current + 5))
+        await self._async_schedule_volume(min(100, self._current_volume() + 5))
 
     async def async_volume_down(self) -> None:
         """Decrease volume by 5%."""
-        current = self._api.state.get("volume", 50)
-        await self._api.set_volume(max(0, current - 5))
+        await self._async_schedule_volume(max(0, self._current_volume() - 5))
+
+    async def _async_schedule_volume(self, volume: int) -> None:
+        """Send a volume level once changes stop arriving.
+
+        Holding a volume button fires a step every few milliseconds;
+        only the level it ends on is sent to the device.
+        """
+        if volume == self._current_volume():
+            # Already there (or about to be); nothing to send
+            return
+        self._pending_volume = volume
+        if self._volume_timer is not None:
+            self._volume_timer.cancel()
+            self._volume_timer = None
+
+        if not VOLUME_DEBOUNCE_DELAY:
+            await self._async_send_volume()
+            return
+
+        self._volume_timer = self.hass.loop.call_later(
+            VOLUME_DEBOUNCE_DELAY, self._send_pending_volume
+        )
+        self.async_write_ha_state()
+
+    @callback
+    def _send_pending_volume(self) -> None:
+        """Send the pending volume level when the debounce timer fires."""
+        self._volume_timer = None
+        # A newer level supersedes one still being sent
+        if self._volume_send is not None:
+            self._volume_send.cancel()
+        self._volume_send = self.hass.async_create_task(self._async_send_volume())
+
+    async def _async_send_volume(self) -> None:
+        """Send the pending volume level to the device."""
+        volume = self._pending_volume
+        if volume is None:
+            return
+        sent = await self._api.set_volume(volume)
+        # Keep showing the pending level if another change came in meanwhile
+        if self._pending_volume == volume and self._volume_timer is None:
+            self._pending_volume = None
+            # On success the API's state callback writes the new level;
+            # otherwise go back to showing the level the device still has
+            if not sent:
+                self.async_write_ha_state()
 
     async def async_mute_volume(self, mute: bool) -> None:
         """Mute or unmute the speaker."""
-        if await self._api.set_mute(mute):
-            self._is_muted = mute
-            self.async_write_ha_state()
-
-    @property
-    def available(self) -> bool:
-        """Return True if entity is available."""
-        return self._api.connected
-
-    async def async_update(self) -> None:
-        """Poll the device for current volume state."""
-        await self._api.get_volume()
+        if mute == self._api.state.get("muted"):
+            return
+        # On success the API's state callback writes the new state
+        await self._api.set_mute(mute)